@@ -4,7 +4,7 @@ import mediapipe as mp
 import tensorflow as tf
 from PIL import Image
 import io
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, BinaryIO, Optional, List, Union
 import json
 from datetime import datetime
 import asyncio
@@ -65,7 +65,30 @@ class Core5Engine:
             self.wrinkles_model = None
             self.texture_model = None
     
-    async def analyze_image(self, image_data: bytes, user_id: str, routine: Dict[str, Any]) -> AnalysisResponse:
+    def analyze_image_sync(self, image_data: Union[bytes, BinaryIO], user_id: str, routine: Dict[str, Any]) -> AnalysisResponse:
+        """Synchronous wrapper around analyze_image for pool workers
+
+        The analysis pipeline is pure CPU - none of the async feature
+        methods actually block on I/O - so driving it with asyncio.run
+        inside a worker process is safe.
+        """
+        return asyncio.run(self.analyze_image(image_data, user_id, routine))
+
+    def warmup(self):
+        """Run one dummy inference to force lazy model initialization
+
+        MediaPipe builds its processing graph on the first frame it sees,
+        so the first real request would otherwise pay several seconds of
+        setup. Called from the app's lifespan startup, off the event loop.
+        """
+        try:
+            dummy = np.zeros((224, 224, 3), dtype=np.uint8)
+            self.face_mesh.process(dummy)
+            print("🔥 [AI ENGINE] Warm-up inference complete")
+        except Exception as e:
+            print(f"⚠️ [AI ENGINE] Warm-up failed: {e}")
+
+    async def analyze_image(self, image_data: Union[bytes, BinaryIO], user_id: str, routine: Dict[str, Any]) -> AnalysisResponse:
         """Enhanced analysis with confidence scoring - maintains existing flow"""
         try:
             print(f"🔍 [AI ENGINE] Starting enhanced analysis for user: {user_id}")
@@ -199,10 +222,24 @@ class Core5Engine:
         
         return max(consistency_score, 0.0)
     
-    def _bytes_to_cv2(self, image_data: bytes) -> np.ndarray:
-        """Enhanced image preprocessing with lighting normalization"""
+    def _bytes_to_cv2(self, image_data: Union[bytes, BinaryIO]) -> np.ndarray:
+        """Enhanced image preprocessing with lighting normalization
+
+        Accepts raw bytes or a binary file-like object (e.g. an upload's
+        spooled temp file) so callers can avoid copying the whole image
+        into a bytes object first.
+        """
         try:
-            nparr = np.frombuffer(image_data, np.uint8)
+            if hasattr(image_data, 'read'):
+                image_data.seek(0)
+                try:
+                    # Disk-backed files read straight into the array
+                    nparr = np.fromfile(image_data, np.uint8)
+                except (io.UnsupportedOperation, OSError):
+                    # In-memory spooled files have no fileno
+                    nparr = np.frombuffer(image_data.read(), np.uint8)
+            else:
+                nparr = np.frombuffer(image_data, np.uint8)
             image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             
             if image is None:
@@ -1470,3 +1507,23 @@ class Core5Engine:
             lifestyle_insights=lifestyle_insights,
             routine_effectiveness=[]
         )
+
+# Per-process engine for the analysis process pool. Created lazily inside
+# each worker so MediaPipe/TFLite state is never pickled across processes.
+_worker_engine: Optional[Core5Engine] = None
+
+def _get_worker_engine() -> Core5Engine:
+    """Return this worker process's engine, loading models on first use"""
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = Core5Engine()
+        _worker_engine.warmup()
+    return _worker_engine
+
+def warmup_worker():
+    """Force a pool worker to load and warm its engine"""
+    _get_worker_engine()
+
+def analyze_image_in_worker(image_data: bytes, user_id: str, routine: Dict[str, Any]) -> AnalysisResponse:
+    """Entry point for ProcessPoolExecutor workers"""
+    return _get_worker_engine().analyze_image_sync(image_data, user_id, routine)
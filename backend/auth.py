@@ -2,8 +2,12 @@ import firebase_admin
 from firebase_admin import credentials, auth
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import asyncio
+import hashlib
 import os
-from typing import Optional
+from typing import Dict, Optional
+
+from cachetools import TTLCache
 
 # Initialize Firebase Admin SDK
 def initialize_firebase():
@@ -45,11 +49,52 @@ async def verify_token(credentials: HTTPAuthorizationCredentials) -> dict:
             detail=f"Invalid authentication credentials: {str(e)}"
         )
 
+# Short-lived cache of verified token payloads, keyed by SHA-256 of the raw
+# token. Signature verification is pure CPU, so repeated requests from the
+# same client within the TTL skip the crypto entirely. 30s is well below the
+# token lifetime, so revocation lag stays negligible.
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+_token_locks: Dict[bytes, asyncio.Lock] = {}
+
+async def verify_token_cached(credentials: HTTPAuthorizationCredentials) -> dict:
+    """
+    Verify a token with a short TTL cache so repeated requests skip crypto
+    """
+    key = hashlib.sha256(credentials.credentials.encode()).digest()
+
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    # Per-token lock so concurrent requests with the same token verify once
+    lock = _token_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            payload = _token_cache.get(key)
+            if payload is None:
+                payload = await verify_token(credentials)
+                _token_cache[key] = payload
+            return payload
+    finally:
+        _token_locks.pop(key, None)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """
     Get current user from Firebase token
+
+    FastAPI memoizes dependency results per request, so verification runs
+    at most once no matter how many dependencies need the user.
+    """
+    return await verify_token_cached(credentials)
+
+async def get_current_user_id(payload: dict = Depends(get_current_user)) -> str:
+    """
+    Get the current user's id, raising 401 when the token carries none
     """
-    return await verify_token(credentials)
+    user_id = payload.get("uid") or payload.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return user_id
 
 async def verify_guest_user(user_id: str) -> bool:
     """
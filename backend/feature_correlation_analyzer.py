@@ -1,12 +1,73 @@
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from collections import defaultdict
+import logging
 import statistics
 import math
 from datetime import datetime, timedelta
 
+import numpy as np
+
+logger = logging.getLogger("sleepface.analysis")
+
+# Feature columns of the score matrix, in a fixed order so the numeric
+# reductions index columns instead of looking up dict keys per scan
+FEATURES = ('dark_circles', 'puffiness', 'brightness', 'wrinkles', 'texture')
+
+# Display-name tables are process-wide constants - built once at import
+# instead of per recommendation call
+FEATURE_DISPLAY_NAMES = {
+    'dark_circles': 'dark circles',
+    'puffiness': 'puffiness',
+    'brightness': 'skin brightness',
+    'wrinkles': 'wrinkles',
+    'texture': 'skin texture'
+}
+
+PRODUCT_DISPLAY_NAMES = {
+    'vitamin_c_serum': 'Vitamin C Serum',
+    'retinol': 'Retinol',
+    'sunscreen': 'Sunscreen',
+    'moisturizer': 'Moisturizer',
+    'niacinamide_serum': 'Niacinamide Serum',
+    'aha_exfoliant': 'AHA Exfoliant',
+    'bha_exfoliant': 'BHA Exfoliant',
+    'hyaluronic_acid': 'Hyaluronic Acid',
+    'peptide_serum': 'Peptide Serum'
+}
+
+def _build_score_matrix(data: List[Dict]) -> np.ndarray:
+    """Restructure scans (list of dicts) into a (n_scans, n_features) matrix
+
+    Missing features become NaN. Built once per analysis so the hot numeric
+    reductions run as NumPy array ops instead of Python loops over dicts.
+    The buffer is allocated once and filled by np.fromiter in C - no
+    intermediate Python lists and no per-cell indexed assignments.
+    """
+    values = (
+        value if (value := entry.get('features', {}).get(feature)) is not None else np.nan
+        for entry in data
+        for feature in FEATURES
+    )
+    matrix = np.fromiter(values, dtype=np.float64, count=len(data) * len(FEATURES))
+    return matrix.reshape(len(data), len(FEATURES))
+
+def _halves_improvement(values: np.ndarray) -> float:
+    """Mean of the recent half minus mean of the early half"""
+    half = values.size // 2
+    return float(values[half:].mean() - values[:half].mean())
+
+def _trend_consistency(values: np.ndarray) -> float:
+    """Fraction of scan-to-scan deltas that move in the improving direction"""
+    deltas = np.diff(values)
+    if deltas.size == 0:
+        return 0.0
+    return float(np.count_nonzero(deltas > 0) / deltas.size)
+
 @dataclass
 class FeatureImprovement:
+    __slots__ = ('feature', 'improvement', 'confidence', 'products_involved',
+                 'time_period', 'recommendation')
     feature: str
     improvement: float
     confidence: float
@@ -16,6 +77,8 @@ class FeatureImprovement:
 
 @dataclass
 class ProductFeatureImpact:
+    __slots__ = ('product_id', 'product_name', 'feature_impacts', 'overall_effectiveness',
+                 'confidence_score', 'usage_days', 'recommendation')
     product_id: str
     product_name: str
     feature_impacts: Dict[str, float]  # feature -> improvement score
@@ -26,6 +89,8 @@ class ProductFeatureImpact:
 
 @dataclass
 class SmartInsight:
+    __slots__ = ('insight_type', 'title', 'description', 'confidence',
+                 'evidence', 'actionable', 'priority')
     insight_type: str  # 'product_working', 'product_harming', 'missing_opportunity', 'routine_optimization'
     title: str
     description: str
@@ -57,11 +122,16 @@ class FeatureCorrelationAnalyzer:
             'cleanser': 'basic_care'
         }
     
-    def analyze_feature_product_correlations(self, historical_data: List[Dict]) -> Dict[str, Any]:
+    def analyze_feature_product_correlations(self, historical_data: List[Dict],
+                                             only_features: Optional[set] = None,
+                                             only_products: Optional[set] = None) -> Dict[str, Any]:
         """
         Analyze correlations between specific products and facial feature improvements
+
+        `only_features` / `only_products` restrict the analysis to the named
+        features/products so a single-row request skips the rest of the work.
         """
-        print("🔬 [FEATURE CORRELATION] Analyzing product-feature correlations...")
+        logger.debug("🔬 [FEATURE CORRELATION] Analyzing product-feature correlations...")
         
         if len(historical_data) < 3:
             return {
@@ -73,10 +143,10 @@ class FeatureCorrelationAnalyzer:
         sorted_data = sorted(historical_data, key=lambda x: x.get('date', ''))
         
         # Analyze each feature
-        feature_improvements = self._analyze_feature_improvements(sorted_data)
-        
+        feature_improvements = self._analyze_feature_improvements(sorted_data, only_features)
+
         # Analyze product impacts
-        product_impacts = self._analyze_product_impacts(sorted_data)
+        product_impacts = self._analyze_product_impacts(sorted_data, only_products)
         
         # Generate smart insights
         smart_insights = self._generate_smart_insights(feature_improvements, product_impacts, sorted_data)
@@ -84,11 +154,17 @@ class FeatureCorrelationAnalyzer:
         # Calculate trust metrics
         trust_metrics = self._calculate_trust_metrics(sorted_data, feature_improvements, product_impacts)
         
+        # Side indexes so endpoints can look up one row in O(1)
+        improvements_by_name = {imp.feature: asdict(imp) for imp in feature_improvements}
+        impacts_by_id = {impact.product_id: asdict(impact) for impact in product_impacts}
+
         return {
             "insufficient_data": False,
-            "feature_improvements": [improvement.__dict__ for improvement in feature_improvements],
-            "product_impacts": [impact.__dict__ for impact in product_impacts],
-            "smart_insights": [insight.__dict__ for insight in smart_insights],
+            "feature_improvements": list(improvements_by_name.values()),
+            "feature_improvements_by_name": improvements_by_name,
+            "product_impacts": list(impacts_by_id.values()),
+            "product_impacts_by_id": impacts_by_id,
+            "smart_insights": [asdict(insight) for insight in smart_insights],
             "trust_metrics": trust_metrics,
             "analysis_period": {
                 "start_date": sorted_data[0].get('date'),
@@ -97,62 +173,71 @@ class FeatureCorrelationAnalyzer:
             }
         }
     
-    def _analyze_feature_improvements(self, data: List[Dict]) -> List[FeatureImprovement]:
+    def _analyze_feature_improvements(self, data: List[Dict],
+                                      only_features: Optional[set] = None) -> List[FeatureImprovement]:
         """Analyze improvements in each facial feature"""
-        print("📊 [FEATURE CORRELATION] Analyzing feature improvements...")
+        logger.debug("📊 [FEATURE CORRELATION] Analyzing feature improvements...")
         
+        # Build the score matrix once; each feature is then a column slice
+        score_matrix = _build_score_matrix(data)
+
+        # The engine always emits all five features, so the usual matrix is
+        # dense - reduce every column together in whole-matrix operations
+        # (the feature axis runs inside NumPy's C loop, not Python)
+        dense = not np.isnan(score_matrix).any()
+        if dense:
+            half = score_matrix.shape[0] // 2
+            all_improvements = score_matrix[half:].mean(axis=0) - score_matrix[:half].mean(axis=0)
+            all_consistency = (np.diff(score_matrix, axis=0) > 0).mean(axis=0)
+
         improvements = []
-        features = ['dark_circles', 'puffiness', 'brightness', 'wrinkles', 'texture']
-        
-        for feature in features:
-            improvement = self._calculate_feature_improvement(feature, data)
+        for col, feature in enumerate(FEATURES):
+            if only_features is not None and feature not in only_features:
+                continue
+            if dense:
+                improvement = self._build_feature_improvement(
+                    feature, float(all_improvements[col]),
+                    float(all_consistency[col]), score_matrix.shape[0], data
+                )
+            else:
+                # Sparse fallback: reduce each column over its valid scans
+                column = score_matrix[:, col]
+                values = column[~np.isnan(column)]
+                improvement = self._calculate_feature_improvement(feature, values, data)
             if improvement:
                 improvements.append(improvement)
-        
+
         return improvements
-    
-    def _calculate_feature_improvement(self, feature: str, data: List[Dict]) -> Optional[FeatureImprovement]:
-        """Calculate improvement for a specific feature"""
-        if len(data) < 3:
-            return None
-        
-        # Get feature values over time
-        feature_values = []
-        for entry in data:
-            features = entry.get('features', {})
-            if feature in features:
-                feature_values.append({
-                    'date': entry.get('date'),
-                    'value': features[feature],
-                    'routine': entry.get('routine', {})
-                })
-        
-        if len(feature_values) < 3:
+
+    def _calculate_feature_improvement(self, feature: str, values: np.ndarray, data: List[Dict]) -> Optional[FeatureImprovement]:
+        """Calculate improvement for a specific feature from its score column"""
+        if values.size < 3:
             return None
-        
-        # Calculate improvement trend
-        early_values = feature_values[:len(feature_values)//2]
-        recent_values = feature_values[len(feature_values)//2:]
-        
-        early_avg = statistics.mean([v['value'] for v in early_values])
-        recent_avg = statistics.mean([v['value'] for v in recent_values])
-        improvement = recent_avg - early_avg
-        
+
+        # Calculate improvement trend (recent half vs early half)
+        improvement = _halves_improvement(values)
+        consistency = _trend_consistency(values)
+
+        return self._build_feature_improvement(feature, improvement, consistency, values.size, data)
+
+    def _build_feature_improvement(self, feature: str, improvement: float, consistency: float,
+                                   n_values: int, data: List[Dict]) -> FeatureImprovement:
+        """Assemble a FeatureImprovement from precomputed reductions"""
         # Identify products that might be contributing
         contributing_products = self._identify_contributing_products(feature, data)
-        
+
         # Calculate confidence based on data consistency
-        confidence = self._calculate_confidence(feature_values, improvement)
-        
+        confidence = self._calculate_confidence(consistency, improvement, n_values)
+
         # Generate recommendation
         recommendation = self._generate_feature_recommendation(feature, improvement, contributing_products)
-        
+
         return FeatureImprovement(
             feature=feature,
             improvement=round(improvement, 1),
             confidence=round(confidence, 2),
             products_involved=contributing_products,
-            time_period=f"{len(feature_values)} days",
+            time_period=f"{n_values} days",
             recommendation=recommendation
         )
     
@@ -198,49 +283,24 @@ class FeatureCorrelationAnalyzer:
         
         return contributing
     
-    def _calculate_confidence(self, feature_values: List[Dict], improvement: float) -> float:
+    def _calculate_confidence(self, consistency: float, improvement: float, n_values: int) -> float:
         """Calculate confidence score for the improvement"""
-        if len(feature_values) < 3:
-            return 0.0
-        
-        # Calculate consistency of improvement
-        values = [v['value'] for v in feature_values]
-        if len(values) < 2:
-            return 0.0
-        
-        # Calculate trend consistency
-        improvements = []
-        for i in range(1, len(values)):
-            improvements.append(values[i] - values[i-1])
-        
-        if not improvements:
+        if n_values < 3:
             return 0.0
-        
-        # Consistency score based on how often improvement direction is maintained
-        positive_improvements = sum(1 for imp in improvements if imp > 0)
-        consistency = positive_improvements / len(improvements)
-        
+
         # Magnitude score based on improvement size
         magnitude = min(1.0, abs(improvement) / 50.0)  # Normalize to 0-1
-        
+
         # Data quality score based on number of data points
-        data_quality = min(1.0, len(feature_values) / 10.0)  # Normalize to 0-1
-        
+        data_quality = min(1.0, n_values / 10.0)  # Normalize to 0-1
+
         # Combined confidence score
         confidence = (consistency * 0.4 + magnitude * 0.4 + data_quality * 0.2)
         return min(1.0, confidence)
     
     def _generate_feature_recommendation(self, feature: str, improvement: float, products: List[str]) -> str:
         """Generate recommendation for feature improvement"""
-        feature_names = {
-            'dark_circles': 'dark circles',
-            'puffiness': 'puffiness',
-            'brightness': 'skin brightness',
-            'wrinkles': 'wrinkles',
-            'texture': 'skin texture'
-        }
-        
-        feature_name = feature_names.get(feature, feature)
+        feature_name = FEATURE_DISPLAY_NAMES.get(feature, feature)
         
         if improvement > 10:
             if products:
@@ -268,9 +328,10 @@ class FeatureCorrelationAnalyzer:
             else:
                 return f"Your {feature_name} is stable. Consider adding products for improvement."
     
-    def _analyze_product_impacts(self, data: List[Dict]) -> List[ProductFeatureImpact]:
+    def _analyze_product_impacts(self, data: List[Dict],
+                                 only_products: Optional[set] = None) -> List[ProductFeatureImpact]:
         """Analyze how each product impacts different features"""
-        print("🔍 [FEATURE CORRELATION] Analyzing product impacts...")
+        logger.debug("🔍 [FEATURE CORRELATION] Analyzing product impacts...")
         
         # Group data by products used
         product_usage = defaultdict(list)
@@ -284,6 +345,8 @@ class FeatureCorrelationAnalyzer:
             products = self._extract_products(skincare_products, product_used_text)
             
             for product in products:
+                if only_products is not None and product not in only_products:
+                    continue
                 product_usage[product].append({
                     'date': entry.get('date'),
                     'features': entry.get('features', {}),
@@ -338,21 +401,18 @@ class FeatureCorrelationAnalyzer:
         
         # Sort by date
         usage_data.sort(key=lambda x: x['date'])
-        
-        # Calculate before/after for each feature
-        features = ['dark_circles', 'puffiness', 'brightness', 'wrinkles', 'texture']
+
+        # Calculate before/after for each feature (recent half vs early half)
+        score_matrix = _build_score_matrix(usage_data)
         feature_impacts = {}
-        
-        for feature in features:
-            values = [entry['features'].get(feature, 0) for entry in usage_data if feature in entry['features']]
-            if len(values) < 2:
+
+        for col, feature in enumerate(FEATURES):
+            column = score_matrix[:, col]
+            values = column[~np.isnan(column)]
+            if values.size < 2:
                 continue
-            
-            # Calculate improvement
-            early_avg = statistics.mean(values[:len(values)//2])
-            recent_avg = statistics.mean(values[len(values)//2:])
-            improvement = recent_avg - early_avg
-            feature_impacts[feature] = improvement
+
+            feature_impacts[feature] = _halves_improvement(values)
         
         if not feature_impacts:
             return None
@@ -405,14 +465,7 @@ class FeatureCorrelationAnalyzer:
             # Identify which features improved most
             best_features = [f for f, imp in feature_impacts.items() if imp > 5]
             if best_features:
-                feature_names = {
-                    'dark_circles': 'dark circles',
-                    'puffiness': 'puffiness',
-                    'brightness': 'brightness',
-                    'wrinkles': 'wrinkles',
-                    'texture': 'texture'
-                }
-                improved_features = [feature_names.get(f, f) for f in best_features]
+                improved_features = [f.replace('_', ' ') for f in best_features]
                 return f"Excellent! {product_name} is working very well for your {', '.join(improved_features)}. Keep using it consistently."
             else:
                 return f"Excellent! {product_name} is showing great overall results. Keep using it consistently."
@@ -427,24 +480,13 @@ class FeatureCorrelationAnalyzer:
     
     def _get_product_display_name(self, product_id: str) -> str:
         """Get display name for product"""
-        names = {
-            'vitamin_c_serum': 'Vitamin C Serum',
-            'retinol': 'Retinol',
-            'sunscreen': 'Sunscreen',
-            'moisturizer': 'Moisturizer',
-            'niacinamide_serum': 'Niacinamide Serum',
-            'aha_exfoliant': 'AHA Exfoliant',
-            'bha_exfoliant': 'BHA Exfoliant',
-            'hyaluronic_acid': 'Hyaluronic Acid',
-            'peptide_serum': 'Peptide Serum'
-        }
-        return names.get(product_id, product_id.replace('_', ' ').title())
+        return PRODUCT_DISPLAY_NAMES.get(product_id, product_id.replace('_', ' ').title())
     
     def _generate_smart_insights(self, feature_improvements: List[FeatureImprovement], 
                                 product_impacts: List[ProductFeatureImpact], 
                                 data: List[Dict]) -> List[SmartInsight]:
         """Generate smart insights based on analysis"""
-        print("💡 [FEATURE CORRELATION] Generating smart insights...")
+        logger.debug("💡 [FEATURE CORRELATION] Generating smart insights...")
         
         insights = []
         
@@ -1,13 +1,22 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
+from fastapi import FastAPI, HTTPException, Depends, Request, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import uvicorn
+import asyncio
+import hashlib
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 import os
 from dotenv import load_dotenv
 from typing import Optional, Dict, Any, List
-import json
-from datetime import datetime, date
+import orjson
+from datetime import datetime, date, timedelta
+from cachetools import TTLCache
 
 from models import (
     AnalysisRequest, AnalysisResponse, UserData, DailySummary, AnalysisError, 
@@ -15,10 +24,10 @@ from models import (
     UserRegistration, UserLogin, UserProfile, AuthResponse, PasswordResetRequest, 
     PasswordReset, UserUpdate
 )
-from ai_engine import Core5Engine
-from auth import verify_token
+from ai_engine import Core5Engine, analyze_image_in_worker, warmup_worker
+from auth import get_current_user, get_current_user_id
 from database import get_database
-from llm_service import FlexibleLLMService
+from llm_service import FlexibleLLMService, ModelType, close_http_client
 from trend_analysis_service import trend_analysis_service
 from historical_data_service import historical_data_service
 from feature_correlation_analyzer import feature_correlation_analyzer
@@ -29,31 +38,86 @@ from smart_summary_service import smart_summary_service
 # Load environment variables
 load_dotenv()
 
+# Structured logging instead of print() - formatting is lazy (%s args) and
+# production silences the chatty per-request lines via LOG_LEVEL. Records go
+# through a queue so the stdout flush happens on a background thread instead
+# of in the request path.
+_log_queue: SimpleQueue = SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "WARNING"),
+    handlers=[QueueHandler(_log_queue)]
+)
+logger = logging.getLogger("sleepface")
+
 # Initialize LLM service after environment variables are loaded
 llm_service = FlexibleLLMService()
 
+# Valid model names, precomputed once for priority validation
+_VALID_MODEL_VALUES = {model.value for model in ModelType}
+
+def _build_models_payload() -> Dict[str, Any]:
+    """Build the /models/available payload (recomputed only when priority changes)"""
+    available_models = llm_service.get_available_models()
+    return {
+        "available_models": [model.value for model in available_models],
+        "current_priority": [model.value for model in llm_service.model_priority],
+        "total_models": len(available_models)
+    }
+
 # Lifespan event handler for startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     try:
-        # Set up MongoDB connection for historical_data_service
+        # Set up MongoDB connection once and share the handle across requests
         db = await get_database()
+        app.state.db = db
+        app.state.auth_service = UserAuthService(db)
         historical_data_service.set_database(db)
-        print("✅ [STARTUP] Historical data service connected to MongoDB")
+        logger.info("✅ [STARTUP] Historical data service connected to MongoDB")
     except Exception as e:
-        print(f"⚠️ [STARTUP] Failed to connect historical data service to MongoDB: {e}")
-    
+        app.state.db = None
+        app.state.auth_service = None
+        logger.warning("⚠️ [STARTUP] Failed to connect historical data service to MongoDB: %s", e)
+
+    # /models/available serves the same payload until the priority changes -
+    # compute it once instead of re-checking every provider per request
+    app.state.models_payload = _build_models_payload()
+
+    # Analysis runs in a process pool so the CPU-bound CV work never holds
+    # the event loop (or the GIL of the server process). The initializer
+    # warms each worker as it boots, so even workers spawned later never
+    # pay the lazy model initialization on a real request. Workers must be
+    # spawned, not forked: the parent has already initialized
+    # TensorFlow/MediaPipe (threads and locks), and forking that state is
+    # an intermittent-deadlock hazard on Linux.
+    app.state.cpu_pool = ProcessPoolExecutor(
+        max_workers=int(os.getenv("ANALYSIS_WORKERS", "2")),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=warmup_worker
+    )
+
+    # Force the first worker to spawn (and warm) before serving traffic
+    await asyncio.get_running_loop().run_in_executor(app.state.cpu_pool, warmup_worker)
+    logger.info("✅ [STARTUP] AI engine warmed up")
+
     yield
-    
+
+    app.state.cpu_pool.shutdown()
+    await close_http_client()
+
     # Shutdown (if needed)
-    print("👋 [SHUTDOWN] Cleaning up...")
+    logger.info("👋 [SHUTDOWN] Cleaning up...")
+    _log_listener.stop()
 
 app = FastAPI(
     title="Sleep Face API",
     description="AI-powered sleep and skin health tracking API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware for React Native
@@ -65,8 +129,212 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Security
-security = HTTPBearer()
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Uniform 500 for anything an endpoint didn't handle itself
+
+    Replaces the identical try/except blocks the analysis endpoints used to
+    carry; domain-specific HTTPExceptions still raise in-line.
+    """
+    logger.exception("❌ [API] Unhandled error on %s %s", request.method, request.url.path)
+    return ORJSONResponse(
+        status_code=500,
+        content={"detail": f"Internal error: {exc}"}
+    )
+
+def get_db(request: Request) -> AsyncIOMotorDatabase:
+    """Return the shared database handle cached on app.state at startup"""
+    return request.app.state.db
+
+def get_auth_service(request: Request) -> UserAuthService:
+    """Return the shared auth service instance created at startup"""
+    return request.app.state.auth_service
+
+# Smart analysis is pure CPU over a user's history, and a dashboard load hits
+# several endpoints that all need the same result - cache it per (user, days)
+# with a short TTL and coalesce concurrent misses onto one computation
+_smart_analysis_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_smart_analysis_locks: Dict[tuple, asyncio.Lock] = {}
+
+def _invalidate_smart_analysis_cache(user_id: str):
+    """Drop cached smart analysis for a user after a new scan is saved"""
+    stale_keys = [key for key in _smart_analysis_cache.keys() if key[0] == user_id]
+    for key in stale_keys:
+        _smart_analysis_cache.pop(key, None)
+
+# Day windows the dashboard actually requests - precomputed at ingest time
+_PRECOMPUTED_ANALYSIS_DAYS = (7, 30)
+
+def _analysis_etag(smart_analysis: Dict[str, Any], *parts: Any) -> str:
+    """Weak ETag for an analysis payload
+
+    Derived from the analysis period (which only moves when a new scan
+    lands) plus the request parameters, so repeated polls between scans
+    validate against the same tag.
+    """
+    period = smart_analysis.get("analysis_period", {})
+    raw = ":".join(str(part) for part in parts)
+    raw = f"{raw}:{period.get('end_date')}:{period.get('total_days')}"
+    return 'W/"%s"' % hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+def _improvement_by_name(smart_analysis: Dict[str, Any], feature: str) -> Optional[Dict[str, Any]]:
+    """O(1) lookup of one feature improvement via the analyzer's side index"""
+    by_name = smart_analysis.get("feature_improvements_by_name")
+    if by_name is None:
+        # Persisted payloads from before the index existed
+        by_name = {imp.get("feature"): imp for imp in smart_analysis.get("feature_improvements", [])}
+    return by_name.get(feature)
+
+def _impact_by_id(smart_analysis: Dict[str, Any], product_id: str) -> Optional[Dict[str, Any]]:
+    """O(1) lookup of one product impact via the analyzer's side index"""
+    by_id = smart_analysis.get("product_impacts_by_id")
+    if by_id is None:
+        # Persisted payloads from before the index existed
+        by_id = {impact.get("product_id"): impact for impact in smart_analysis.get("product_impacts", [])}
+    return by_id.get(product_id)
+
+# Analyzer-internal lookup indexes - duplicates of feature_improvements /
+# product_impacts that exist only for O(1) row lookups and must not reach
+# the wire
+_INTERNAL_ANALYSIS_KEYS = ("feature_improvements_by_name", "product_impacts_by_id")
+
+def _conditional_analysis_response(request: Request, etag: str, payload: Dict[str, Any]) -> Response:
+    """Serve a payload with ETag/Cache-Control, or 304 when the client is current
+
+    Analyzer-internal side indexes are stripped here so endpoints that
+    return the analysis dict verbatim don't serialize every row twice.
+    """
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+    if any(key in payload for key in _INTERNAL_ANALYSIS_KEYS):
+        payload = {
+            key: value for key, value in payload.items()
+            if key not in _INTERNAL_ANALYSIS_KEYS
+        }
+    return ORJSONResponse(
+        payload,
+        headers={"ETag": etag, "Cache-Control": "private, max-age=30"}
+    )
+
+async def _get_persisted_smart_analysis(user_id: str, days: int) -> Optional[Dict[str, Any]]:
+    """Fetch the precomputed smart-analysis document if it is still fresh
+
+    Fresh means it was computed at or after the user's latest scan; a stale
+    or missing document returns None so the caller computes live.
+    """
+    db = historical_data_service.db
+    if db is None or user_id == "guest" or user_id.startswith("guest_"):
+        return None
+    if days not in _PRECOMPUTED_ANALYSIS_DAYS:
+        return None
+
+    try:
+        from database import get_user_analysis
+        doc, latest_scan = await asyncio.gather(
+            get_user_analysis(db, user_id, days),
+            db.analyses.find_one(
+                {"user_id": user_id}, {"created_at": 1}, sort=[("created_at", -1)]
+            )
+        )
+        if doc is None or latest_scan is None:
+            return None
+        last_scan_ts = doc.get("last_scan_ts")
+        if last_scan_ts is None or last_scan_ts < latest_scan.get("created_at"):
+            return None
+        return doc.get("payload")
+    except Exception as e:
+        logger.warning("⚠️ [ANALYSIS] Failed to fetch precomputed analysis: %s", e)
+        return None
+
+# Strong references to in-flight rebuild tasks - the event loop only keeps
+# weak references, so a bare create_task could be garbage-collected before
+# the persisted document is written
+_background_tasks: set = set()
+
+def _spawn_rebuild_smart_analysis(user_id: str) -> None:
+    """Schedule the ingest-time rebuild, keeping the task alive until done"""
+    task = asyncio.create_task(_rebuild_smart_analysis(user_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def _rebuild_smart_analysis(user_id: str) -> None:
+    """Recompute and persist smart analysis after a scan lands
+
+    Runs as a background task on the ingest path so read endpoints serve a
+    stored document instead of recomputing correlations per request.
+    """
+    db = historical_data_service.db
+    if db is None:
+        return
+    try:
+        from database import save_user_analysis
+        last_scan = await db.analyses.find_one(
+            {"user_id": user_id}, {"created_at": 1}, sort=[("created_at", -1)]
+        )
+        last_scan_ts = last_scan.get("created_at") if last_scan else None
+        for days in _PRECOMPUTED_ANALYSIS_DAYS:
+            smart_analysis = await _cached_smart_analysis(user_id, days)
+            if smart_analysis is not None:
+                await save_user_analysis(db, user_id, days, smart_analysis, last_scan_ts)
+    except Exception as e:
+        logger.warning("⚠️ [ANALYSIS] Failed to precompute smart analysis for %s: %s", user_id, e)
+
+async def _cached_smart_analysis(user_id: str, days: int,
+                                 only_features: Optional[set] = None,
+                                 only_products: Optional[set] = None) -> Optional[Dict[str, Any]]:
+    """Get the feature/product correlation analysis for a user, cached
+
+    Returns None when the user has no historical data. Concurrent requests
+    for the same key share a single computation (single-flight), and a fresh
+    document precomputed at ingest time short-circuits the computation
+    entirely. `only_features`/`only_products` narrow the analyzer's work to
+    the named rows; a cached full analysis always satisfies a narrow request.
+    """
+    full_key = (user_id, days)
+    smart_analysis = _smart_analysis_cache.get(full_key)
+    if smart_analysis is not None:
+        return smart_analysis
+
+    narrow = only_features is not None or only_products is not None
+    if narrow:
+        key = (
+            user_id, days,
+            tuple(sorted(only_features)) if only_features else None,
+            tuple(sorted(only_products)) if only_products else None
+        )
+        smart_analysis = _smart_analysis_cache.get(key)
+        if smart_analysis is not None:
+            return smart_analysis
+    else:
+        key = full_key
+
+    lock = _smart_analysis_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            smart_analysis = _smart_analysis_cache.get(full_key) or _smart_analysis_cache.get(key)
+            if smart_analysis is not None:
+                return smart_analysis
+
+            # The persisted document is always the full analysis
+            smart_analysis = await _get_persisted_smart_analysis(user_id, days)
+            if smart_analysis is not None:
+                _smart_analysis_cache[full_key] = smart_analysis
+                return smart_analysis
+
+            historical_data = await historical_data_service.get_user_history(user_id, days)
+            if not historical_data:
+                return None
+
+            # The analyzer is synchronous CPU work - run it in a thread so
+            # the event loop keeps serving other requests meanwhile
+            smart_analysis = await asyncio.to_thread(
+                feature_correlation_analyzer.analyze_feature_product_correlations,
+                historical_data, only_features, only_products
+            )
+            _smart_analysis_cache[key] = smart_analysis
+            return smart_analysis
+    finally:
+        _smart_analysis_locks.pop(key, None)
 
 # Initialize AI Engine
 ai_engine = Core5Engine()
@@ -75,17 +343,23 @@ ai_engine = Core5Engine()
 async def root():
     return {"message": "Sleep Face API is running!"}
 
+_HEALTH_RESPONSE_BODY = b'{"status":"healthy"}'
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    # Pre-encoded body, no timestamp: load balancers poll this at high
+    # frequency, and the short max-age lets probes be cached at the edge
+    return Response(
+        content=_HEALTH_RESPONSE_BODY,
+        media_type="application/json",
+        headers={"Cache-Control": "max-age=1"}
+    )
 
 # Authentication Endpoints
 @app.post("/auth/register", response_model=AuthResponse)
-async def register_user(user_data: UserRegistration):
+async def register_user(user_data: UserRegistration, auth_service: UserAuthService = Depends(get_auth_service)):
     """Register a new user"""
     try:
-        db = await get_database()
-        auth_service = UserAuthService(db)
         return await auth_service.register_user(user_data)
     except HTTPException:
         raise
@@ -93,11 +367,9 @@ async def register_user(user_data: UserRegistration):
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
 
 @app.post("/auth/login", response_model=AuthResponse)
-async def login_user(login_data: UserLogin):
+async def login_user(login_data: UserLogin, auth_service: UserAuthService = Depends(get_auth_service)):
     """Authenticate user and return tokens"""
     try:
-        db = await get_database()
-        auth_service = UserAuthService(db)
         return await auth_service.login_user(login_data)
     except HTTPException:
         raise
@@ -105,18 +377,12 @@ async def login_user(login_data: UserLogin):
         raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
 
 @app.get("/auth/me", response_model=UserProfile)
-async def get_current_user_profile(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user_profile(
+    user_id: str = Depends(get_current_user_id),
+    auth_service: UserAuthService = Depends(get_auth_service)
+):
     """Get current user profile"""
     try:
-        # Verify token and get user data
-        payload = verify_token(credentials)
-        user_id = payload.get("uid") or payload.get("user_id")
-        
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        db = await get_database()
-        auth_service = UserAuthService(db)
         user_profile = await auth_service.get_user_by_id(user_id)
         
         if not user_profile:
@@ -131,64 +397,50 @@ async def get_current_user_profile(credentials: HTTPAuthorizationCredentials = D
 @app.put("/auth/profile", response_model=UserProfile)
 async def update_user_profile(
     update_data: UserUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_id: str = Depends(get_current_user_id),
+    auth_service: UserAuthService = Depends(get_auth_service)
 ):
     """Update user profile"""
     try:
-        # Verify token and get user data
-        payload = verify_token(credentials)
-        user_id = payload.get("uid") or payload.get("user_id")
-        
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        db = await get_database()
-        auth_service = UserAuthService(db)
         return await auth_service.update_user_profile(user_id, update_data)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update profile: {str(e)}")
 
+def _delete_history_file(user_id: str):
+    """Remove a user's local JSON history file if it exists (blocking I/O)"""
+    from pathlib import Path
+    history_file = Path(f"data/{user_id}_history.json")
+    if history_file.exists():
+        os.remove(history_file)
+        logger.debug("🗑️ [DELETE ACCOUNT] Deleted local history file")
+
 @app.delete("/auth/delete-account")
 async def delete_user_account(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Permanently delete user account and all associated data (GDPR/CCPA Compliance)"""
     try:
-        # Verify token and get user data
-        payload = verify_token(credentials)
-        user_id = payload.get("uid") or payload.get("user_id")
-        
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        print(f"🗑️ [DELETE ACCOUNT] User {user_id} requested account deletion")
-        
-        db = await get_database()
-        
-        # Delete all user's analyses
-        analyses_result = await db.analyses.delete_many({"user_id": user_id})
-        print(f"🗑️ [DELETE ACCOUNT] Deleted {analyses_result.deleted_count} analyses")
-        
-        # Delete all user's sessions
-        sessions_result = await db.sessions.delete_many({"user_id": user_id})
-        print(f"🗑️ [DELETE ACCOUNT] Deleted {sessions_result.deleted_count} sessions")
-        
-        # Delete user document
-        user_result = await db.users.delete_one({"user_id": user_id})
-        print(f"🗑️ [DELETE ACCOUNT] Deleted user account")
-        
-        # Delete local JSON history file if exists
+        logger.debug("🗑️ [DELETE ACCOUNT] User %s requested account deletion", user_id)
+
+        # Delete analyses, sessions and the user document concurrently -
+        # the three round trips are independent
+        analyses_result, sessions_result, user_result = await asyncio.gather(
+            db.analyses.delete_many({"user_id": user_id}),
+            db.sessions.delete_many({"user_id": user_id}),
+            db.users.delete_one({"user_id": user_id})
+        )
+        logger.debug("🗑️ [DELETE ACCOUNT] Deleted %s analyses", analyses_result.deleted_count)
+        logger.debug("🗑️ [DELETE ACCOUNT] Deleted %s sessions", sessions_result.deleted_count)
+        logger.debug("🗑️ [DELETE ACCOUNT] Deleted user account")
+
+        # Delete local JSON history file if exists (off the event loop)
         try:
-            import os
-            from pathlib import Path
-            history_file = Path(f"data/{user_id}_history.json")
-            if history_file.exists():
-                os.remove(history_file)
-                print(f"🗑️ [DELETE ACCOUNT] Deleted local history file")
+            await asyncio.to_thread(_delete_history_file, user_id)
         except Exception as e:
-            print(f"⚠️ [DELETE ACCOUNT] Could not delete local history: {e}")
+            logger.warning("⚠️ [DELETE ACCOUNT] Could not delete local history: %s", e)
         
         return {
             "success": True,
@@ -199,15 +451,13 @@ async def delete_user_account(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ [DELETE ACCOUNT] Failed: {e}")
+        logger.error("❌ [DELETE ACCOUNT] Failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to delete account: {str(e)}")
 
 @app.post("/auth/refresh", response_model=AuthResponse)
-async def refresh_access_token(refresh_token: str):
+async def refresh_access_token(refresh_token: str, auth_service: UserAuthService = Depends(get_auth_service)):
     """Refresh access token using refresh token"""
     try:
-        db = await get_database()
-        auth_service = UserAuthService(db)
         return await auth_service.refresh_access_token(refresh_token)
     except HTTPException:
         raise
@@ -215,18 +465,13 @@ async def refresh_access_token(refresh_token: str):
         raise HTTPException(status_code=500, detail=f"Failed to refresh token: {str(e)}")
 
 @app.post("/auth/logout")
-async def logout_user(refresh_token: str, credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def logout_user(
+    refresh_token: str,
+    user_id: str = Depends(get_current_user_id),
+    auth_service: UserAuthService = Depends(get_auth_service)
+):
     """Logout user by invalidating refresh token"""
     try:
-        # Verify token and get user data
-        payload = verify_token(credentials)
-        user_id = payload.get("uid") or payload.get("user_id")
-        
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        db = await get_database()
-        auth_service = UserAuthService(db)
         success = await auth_service.logout_user(user_id, refresh_token)
         
         if success:
@@ -239,74 +484,73 @@ async def logout_user(refresh_token: str, credentials: HTTPAuthorizationCredenti
         raise HTTPException(status_code=500, detail=f"Logout failed: {str(e)}")
 
 @app.get("/models/available")
-async def get_available_models():
+async def get_available_models(request: Request):
     """Get list of available LLM models"""
     try:
-        available_models = llm_service.get_available_models()
-        return {
-            "available_models": [model.value for model in available_models],
-            "current_priority": [model.value for model in llm_service.model_priority],
-            "total_models": len(available_models)
-        }
+        return request.app.state.models_payload
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get models: {str(e)}")
 
 @app.post("/models/priority")
-async def set_model_priority(priority: List[str]):
+async def set_model_priority(priority: List[str], request: Request):
     """Set the priority order for model selection"""
     try:
-        from llm_service import ModelType
-        
-        # Convert string names to ModelType enums
-        model_types = []
-        for model_name in priority:
-            try:
-                model_type = ModelType(model_name)
-                model_types.append(model_type)
-            except ValueError:
-                raise HTTPException(status_code=400, detail=f"Invalid model type: {model_name}")
-        
+        # Validate with a set membership check instead of constructing a
+        # ValueError per bad name
+        invalid = [name for name in priority if name not in _VALID_MODEL_VALUES]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid model types: {invalid}")
+
+        model_types = [ModelType(name) for name in priority]
         llm_service.set_model_priority(model_types)
+        request.app.state.models_payload = _build_models_payload()
         return {
             "message": "Model priority updated successfully",
             "new_priority": [model.value for model in model_types]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set priority: {str(e)}")
 
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_face(
+    request: Request,
     file: UploadFile = File(...),
     user_id: str = "guest",
-    routine_data: Optional[str] = None
+    routine_data: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """
     Analyze a selfie image and return sleep and skin health scores
     """
     try:
-        print(f"🚀 [API] Received analysis request from user: {user_id}")
-        print(f"📁 [API] File: {file.filename}, Content type: {file.content_type}")
-        print(f"📊 [API] Routine data: {routine_data}")
-        
-        # Read image data
-        image_data = await file.read()
-        print(f"📸 [API] Image data size: {len(image_data)} bytes")
+        logger.debug("🚀 [API] Received analysis request from user: %s", user_id)
+        logger.debug("📁 [API] File: %s, Content type: %s", file.filename, file.content_type)
+        logger.debug("📊 [API] Routine data: %s", routine_data)
         
         # Parse routine data if provided
         routine = {}
         if routine_data:
-            routine = json.loads(routine_data)
-            print(f"📋 [API] Parsed routine data: {routine}")
-        
-        print("🤖 [API] Starting AI analysis...")
-        # Run AI analysis
-        analysis_result = await ai_engine.analyze_image(image_data, user_id, routine)
+            routine = orjson.loads(routine_data)
+            logger.debug("📋 [API] Parsed routine data: %s", routine)
+        
+        logger.debug("🤖 [API] Starting AI analysis...")
+        # Run AI analysis in the process pool - the CV pipeline is CPU-bound
+        # and would otherwise starve every other request behind the GIL.
+        # The upload is read in a thread since the spooled file can't cross
+        # the process boundary.
+        image_data = await asyncio.to_thread(file.file.read)
+        analysis_result = await asyncio.get_running_loop().run_in_executor(
+            request.app.state.cpu_pool, analyze_image_in_worker,
+            image_data, user_id, routine
+        )
         
-        print(f"✅ [API] Analysis complete! Sleep: {analysis_result.sleep_score}, Skin: {analysis_result.skin_health_score}")
+        logger.debug("✅ [API] Analysis complete! Sleep: %s, Skin: %s", analysis_result.sleep_score, analysis_result.skin_health_score)
         
         # Generate data-driven smart summary
         try:
-            print("🧠 [API] Generating data-driven smart summary...")
+            logger.debug("🧠 [API] Generating data-driven smart summary...")
             analysis_data = {
                 "user_id": analysis_result.user_id,
                 "date": analysis_result.date,
@@ -320,9 +564,9 @@ async def analyze_face(
             historical_data = []
             if user_id != "guest":
                 historical_data = await historical_data_service.get_user_history(user_id, 30)
-                print(f"📊 [HISTORICAL DATA] Retrieved {len(historical_data)} entries for user {user_id}")
+                logger.debug("📊 [HISTORICAL DATA] Retrieved %s entries for user %s", len(historical_data), user_id)
             else:
-                print(f"👤 [HISTORICAL DATA] Skipping historical data for guest user")
+                logger.debug("👤 [HISTORICAL DATA] Skipping historical data for guest user")
             
             # Use data-driven smart summary service (no LLM dependency)
             smart_summary = await smart_summary_service.generate_smart_summary(
@@ -332,21 +576,20 @@ async def analyze_face(
             )
             
             if smart_summary:
-                print(f"✨ [API] Data-driven summary generated: {smart_summary.get('daily_summary', 'N/A')[:80]}...")
+                logger.debug("✨ [API] Data-driven summary generated: %s...", smart_summary.get('daily_summary', 'N/A')[:80])
                 # Add smart summary to the response
                 analysis_result.smart_summary = smart_summary
             else:
-                print(f"⚠️ [API] Smart summary is None, skipping")
+                logger.warning("⚠️ [API] Smart summary is None, skipping")
             
         except Exception as e:
-            print(f"⚠️ [API] Smart summary generation failed: {e}")
+            logger.warning("⚠️ [API] Smart summary generation failed: %s", e)
             # Continue without smart summary
         
         # Save data ONLY for registered users (NOT for guests)
         if user_id != "guest":
             try:
                 # Save to MongoDB for persistent storage and historical analysis
-                db = await get_database()
                 mongo_data = {
                     "user_id": analysis_result.user_id,
                     "date": analysis_result.date,
@@ -359,12 +602,8 @@ async def analyze_face(
                     "smart_summary": smart_summary,
                     "created_at": datetime.now()
                 }
-                from database import save_analysis
-                await save_analysis(db, mongo_data)
-                print(f"💾 [MONGODB] Analysis saved to database for registered user {analysis_result.user_id}")
-                
                 # Also save to local JSON for quick trend analysis
-                historical_data = {
+                local_data = {
                     "user_id": analysis_result.user_id,
                     "date": analysis_result.date,
                     "sleep_score": analysis_result.sleep_score,
@@ -372,46 +611,61 @@ async def analyze_face(
                     "features": analysis_result.features.model_dump(),
                     "routine": routine
                 }
-                historical_data_service.save_analysis_data(analysis_result.user_id, historical_data)
-                print(f"💾 [LOCAL] Historical data cached locally for trend analysis")
+
+                # The Mongo write and the local file write are independent -
+                # run them concurrently (the file write goes to a thread since
+                # it's blocking I/O)
+                from database import save_analysis
+                await asyncio.gather(
+                    save_analysis(db, mongo_data),
+                    asyncio.to_thread(
+                        historical_data_service.save_analysis_data,
+                        analysis_result.user_id, local_data
+                    )
+                )
+                _invalidate_smart_analysis_cache(analysis_result.user_id)
+                # Rebuild the persisted smart analysis off the request path
+                _spawn_rebuild_smart_analysis(analysis_result.user_id)
+                logger.debug("💾 [MONGODB] Analysis saved to database for registered user %s", analysis_result.user_id)
+                logger.debug("💾 [LOCAL] Historical data cached locally for trend analysis")
             except Exception as e:
-                print(f"⚠️ [STORAGE] Failed to save data for registered user: {e}")
+                logger.warning("⚠️ [STORAGE] Failed to save data for registered user: %s", e)
                 # Continue without saving
         else:
-            print(f"👤 [GUEST] Skipping data storage for guest user (no persistence)")
+            logger.debug("👤 [GUEST] Skipping data storage for guest user (no persistence)")
         
-        print(f"✅ [API] Returning complete result")
+        logger.debug("✅ [API] Returning complete result")
         return analysis_result
         
     except NoFaceDetectedError as e:
-        print(f"❌ [API] No face detected: {e.message}")
+        logger.error("❌ [API] No face detected: %s", e.message)
         raise HTTPException(status_code=400, detail={
             "error": e.error_code,
             "message": e.message,
             "suggestion": "Please upload a clear selfie with your face visible. Make sure your face is well-lit and not obscured."
         })
     except InvalidImageFormatError as e:
-        print(f"❌ [API] Invalid image format: {e.message}")
+        logger.error("❌ [API] Invalid image format: %s", e.message)
         raise HTTPException(status_code=400, detail={
             "error": e.error_code,
             "message": e.message,
             "suggestion": "Please upload a JPEG, PNG, or other supported image format."
         })
     except ImageProcessingError as e:
-        print(f"❌ [API] Image processing error: {e.message}")
+        logger.error("❌ [API] Image processing error: %s", e.message)
         raise HTTPException(status_code=400, detail={
             "error": e.error_code,
             "message": e.message,
             "suggestion": "Please try with a different image or check if the file is corrupted."
         })
     except AnalysisError as e:
-        print(f"❌ [API] Analysis error: {e.message}")
+        logger.error("❌ [API] Analysis error: %s", e.message)
         raise HTTPException(status_code=400, detail={
             "error": e.error_code,
             "message": e.message
         })
     except Exception as e:
-        print(f"❌ [API] Unexpected error: {str(e)}")
+        logger.error("❌ [API] Unexpected error: %s", str(e))
         raise HTTPException(status_code=500, detail={
             "error": "INTERNAL_ERROR",
             "message": "An unexpected error occurred during analysis. Please try again later."
@@ -420,7 +674,8 @@ async def analyze_face(
 @app.get("/user/{user_id}/history")
 async def get_user_history(
     user_id: str,
-    days: int = 7
+    days: int = Query(7, ge=1, le=365),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """
     Get user's analysis history
@@ -430,13 +685,13 @@ async def get_user_history(
     """
     try:
         # No auth required for this endpoint
-        print(f"📊 [API] Fetching history for user {user_id} (no auth required)")
+        logger.debug("📊 [API] Fetching history for user %s (no auth required)", user_id)
         
-        print(f"📊 [API] Fetching {days}-day history for user {user_id}")
+        logger.debug("📊 [API] Fetching %s-day history for user %s", days, user_id)
         
         # Guest users - return empty history from local storage hint
         if user_id == "guest":
-            print(f"👤 [API] Guest user - returning empty history (check local storage)")
+            logger.debug("👤 [API] Guest user - returning empty history (check local storage)")
             return {
                 "history": [],
                 "is_first_time": True,
@@ -444,35 +699,37 @@ async def get_user_history(
                 "message": "Guest users - history stored locally on device only"
             }
         
-        # Get database for registered users
-        db = await get_database()
-        
-        # Query user history
+        # Query user history - project only the fields the client uses and
+        # pull the whole batch in one cursor round trip
         collection = db["analyses"]
         cursor = collection.find(
-            {"user_id": user_id}
+            {"user_id": user_id},
+            {"date": 1, "sleep_score": 1, "skin_health_score": 1,
+             "features": 1, "routine": 1, "fun_label": 1}
         ).sort("date", -1).limit(days)
-        
-        history = []
-        async for doc in cursor:
+
+        history = await cursor.to_list(length=days)
+        for doc in history:
             doc["_id"] = str(doc["_id"])
-            history.append(doc)
         
         # First-time users will have empty history - this is normal!
         if len(history) == 0:
-            print(f"✅ [API] No history yet for user {user_id} (new user)")
+            logger.debug("✅ [API] No history yet for user %s (new user)", user_id)
         else:
-            print(f"✅ [API] Found {len(history)} historical entries for user {user_id}")
-        
-        return {
+            logger.debug("✅ [API] Found %s historical entries for user %s", len(history), user_id)
+
+        # Return the response directly so orjson serializes the raw docs in
+        # one pass - for long histories FastAPI's jsonable_encoder walk over
+        # every nested feature dict costs more than the query itself
+        return ORJSONResponse({
             "history": history,
             "is_first_time": len(history) == 0,
             "is_guest": False,
             "message": "Take your first selfie to start tracking!" if len(history) == 0 else f"Found {len(history)} entries"
-        }
+        })
         
     except Exception as e:
-        print(f"⚠️ [API] History fetch error: {str(e)}")
+        logger.warning("⚠️ [API] History fetch error: %s", str(e))
         # Return empty history instead of error for first-time users
         return {
             "history": [],
@@ -495,35 +752,32 @@ async def get_daily_summary(
         if not date:
             date = datetime.now().strftime("%Y-%m-%d")
 
-        print(f"📊 Generating smart summary for user {user_id} on {date}")
+        logger.debug("📊 Generating smart summary for user %s on %s", user_id, date)
 
         # Get historical data for ultra-smart analysis (skip for guest users)
         historical_data = []
         if user_id != "guest":
             historical_data = await historical_data_service.get_user_history(user_id, 30)
-            print(f"📊 [HISTORICAL DATA] Retrieved {len(historical_data)} entries for user {user_id}")
+            logger.debug("📊 [HISTORICAL DATA] Retrieved %s entries for user %s", len(historical_data), user_id)
         else:
-            print(f"👤 [HISTORICAL DATA] Skipping historical data for guest user")
+            logger.debug("👤 [HISTORICAL DATA] Skipping historical data for guest user")
         
         # Get the most recent analysis for this date (today's selfie analysis)
+        # - a single indexed find_one instead of filtering the history in Python
         today_analysis = None
-        if historical_data:
-            # Find the most recent analysis for the specific date
-            # (since there might be multiple entries for the same date)
-            matching_entries = [entry for entry in historical_data if entry.get('date') == date]
-            if matching_entries:
-                # Get the most recent entry (last one in the list)
-                today_analysis = matching_entries[-1]
-                print(f"📊 Found {len(matching_entries)} entries for {date}, using most recent: Sleep {today_analysis.get('sleep_score')}, Skin {today_analysis.get('skin_health_score')}")
+        if user_id != "guest":
+            today_analysis = await historical_data_service.get_user_entry_for_date(user_id, date)
+            if today_analysis:
+                logger.debug("📊 Found entry for %s, using most recent: Sleep %s, Skin %s", date, today_analysis.get('sleep_score'), today_analysis.get('skin_health_score'))
         
         # If no analysis for today, use the most recent analysis
         if not today_analysis and historical_data:
             today_analysis = historical_data[-1]
-            print(f"⚠️ No analysis found for {date}, using most recent analysis")
+            logger.warning("⚠️ No analysis found for %s, using most recent analysis", date)
         
         # If no historical data at all, use mock data
         if not today_analysis:
-            print(f"⚠️ No historical data found for {user_id}, using mock data")
+            logger.warning("⚠️ No historical data found for %s, using mock data", user_id)
             today_analysis = {
                 "user_id": user_id,
                 "date": date,
@@ -551,11 +805,11 @@ async def get_daily_summary(
             historical_data  # Historical data for trend analysis
         )
 
-        print(f"✅ Data-driven summary generated: {summary['daily_summary'][:80]}...")
+        logger.debug("✅ Data-driven summary generated: %s...", summary['daily_summary'][:80])
         return summary
 
     except Exception as e:
-        print(f"❌ Error generating smart summary: {e}")
+        logger.error("❌ Error generating smart summary: %s", e)
         # Fallback to basic summary
         return {
             "daily_summary": f"Your analysis for {date} shows areas for improvement. Focus on getting better sleep and maintaining a consistent skincare routine.",
@@ -571,34 +825,30 @@ async def get_daily_summary(
 async def generate_daily_summary(
     user_id: str,
     date: str,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """
     Generate daily summary for user
     """
     try:
-        # Verify token
-        await verify_token(credentials.credentials)
-        
-        # Get database
-        db = await get_database()
-        
         # Get today's and yesterday's data
         collection = db["analyses"]
         today = datetime.fromisoformat(date)
-        yesterday = today.replace(day=today.day-1) if today.day > 1 else None
+        yesterday = today - timedelta(days=1)
         
-        today_data = await collection.find_one({
-            "user_id": user_id,
-            "date": today.isoformat()[:10]
-        })
-        
-        yesterday_data = None
-        if yesterday:
-            yesterday_data = await collection.find_one({
+        # The two lookups are independent - issue them concurrently so the
+        # endpoint pays one Mongo round trip instead of two
+        today_data, yesterday_data = await asyncio.gather(
+            collection.find_one({
+                "user_id": user_id,
+                "date": today.isoformat()[:10]
+            }),
+            collection.find_one({
                 "user_id": user_id,
                 "date": yesterday.isoformat()[:10]
             })
+        )
         
         # Generate summary
         summary = await ai_engine.generate_daily_summary(today_data, yesterday_data)
@@ -612,27 +862,23 @@ async def generate_daily_summary(
 async def generate_weekly_summary(
     user_id: str,
     week_start: str,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """
     Generate weekly summary for user
     """
     try:
-        # Verify token
-        await verify_token(credentials.credentials)
-        
-        # Get database
-        db = await get_database()
-        
         # Get week's data
         collection = db["analyses"]
         start_date = datetime.fromisoformat(week_start)
-        
+        end_date = start_date + timedelta(days=7)
+
         cursor = collection.find({
             "user_id": user_id,
             "date": {
                 "$gte": start_date.isoformat()[:10],
-                "$lt": (start_date.replace(day=start_date.day+7)).isoformat()[:10]
+                "$lt": end_date.isoformat()[:10]
             }
         }).sort("date", 1)
         
@@ -651,275 +897,325 @@ async def generate_weekly_summary(
 @app.get("/user/{user_id}/trend-analysis")
 async def get_trend_analysis(
     user_id: str,
-    days: int = 30
+    days: int = Query(30, ge=1, le=365)
 ):
     """
     Get comprehensive trend analysis for a user's skincare routine effectiveness
     """
-    try:
-        print(f"📊 [API] Getting trend analysis for user: {user_id}, days: {days}")
-        
-        # Get historical data
-        historical_data = await historical_data_service.get_user_history(user_id, days)
-        
-        if not historical_data:
-            return {
-                "insufficient_data": True,
-                "message": f"No data available for trend analysis. Need at least 3 data points.",
-                "current_data_points": 0
-            }
-        
-        # Perform trend analysis
-        trend_analysis = await trend_analysis_service.analyze_routine_effectiveness(user_id, historical_data)
-        
-        print(f"✅ [API] Trend analysis completed for user: {user_id}")
-        return trend_analysis
-        
-    except Exception as e:
-        print(f"❌ [API] Trend analysis failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate trend analysis: {str(e)}")
+    logger.debug("📊 [API] Getting trend analysis for user: %s, days: %s", user_id, days)
+
+    # Get historical data
+    historical_data = await historical_data_service.get_user_history(user_id, days)
+
+    if not historical_data:
+        return {
+            "insufficient_data": True,
+            "message": f"No data available for trend analysis. Need at least 3 data points.",
+            "current_data_points": 0
+        }
+
+    # Perform trend analysis
+    trend_analysis = await trend_analysis_service.analyze_routine_effectiveness(user_id, historical_data)
+
+    logger.debug("✅ [API] Trend analysis completed for user: %s", user_id)
+    return trend_analysis
 
 @app.get("/user/{user_id}/product-effectiveness")
 async def get_product_effectiveness(
     user_id: str,
     product_id: str = None,
-    days: int = 30
+    days: int = Query(30, ge=1, le=365)
 ):
     """
     Get effectiveness analysis for specific products or all products
     """
-    try:
-        print(f"🔍 [API] Getting product effectiveness for user: {user_id}, product: {product_id}")
-        
-        # Get historical data
-        historical_data = await historical_data_service.get_user_history(user_id, days)
-        
-        if not historical_data:
-            return {
-                "insufficient_data": True,
-                "message": "No data available for product effectiveness analysis"
-            }
-        
-        # Analyze product effectiveness
-        trend_analysis = await trend_analysis_service.analyze_routine_effectiveness(user_id, historical_data)
-        
-        if product_id:
-            # Filter for specific product
-            product_effectiveness = [
-                product for product in trend_analysis.get('product_effectiveness', [])
-                if product.get('product_id') == product_id
-            ]
-            return {
-                "product_id": product_id,
-                "effectiveness": product_effectiveness[0] if product_effectiveness else None
-            }
-        else:
-            # Return all products
-            return {
-                "product_effectiveness": trend_analysis.get('product_effectiveness', []),
-                "analysis_period": trend_analysis.get('analysis_period', {})
-            }
-        
-    except Exception as e:
-        print(f"❌ [API] Product effectiveness analysis failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to analyze product effectiveness: {str(e)}")
+    logger.debug("🔍 [API] Getting product effectiveness for user: %s, product: %s", user_id, product_id)
+    
+    # Get historical data
+    historical_data = await historical_data_service.get_user_history(user_id, days)
+    
+    if not historical_data:
+        return {
+            "insufficient_data": True,
+            "message": "No data available for product effectiveness analysis"
+        }
+    
+    # Analyze product effectiveness
+    trend_analysis = await trend_analysis_service.analyze_routine_effectiveness(user_id, historical_data)
+    
+    if product_id:
+        # Filter for specific product
+        product_effectiveness = [
+            product for product in trend_analysis.get('product_effectiveness', [])
+            if product.get('product_id') == product_id
+        ]
+        return {
+            "product_id": product_id,
+            "effectiveness": product_effectiveness[0] if product_effectiveness else None
+        }
+    else:
+        # Return all products
+        return {
+            "product_effectiveness": trend_analysis.get('product_effectiveness', []),
+            "analysis_period": trend_analysis.get('analysis_period', {})
+        }
+    
 
 @app.get("/user/{user_id}/routine-insights")
 async def get_routine_insights(
     user_id: str,
-    days: int = 30
+    days: int = Query(30, ge=1, le=365)
 ):
     """
     Get AI-generated insights about routine effectiveness and recommendations
     """
-    try:
-        print(f"💡 [API] Getting routine insights for user: {user_id}, days: {days}")
-        
-        # Get historical data
-        historical_data = await historical_data_service.get_user_history(user_id, days)
-        
-        if not historical_data:
-            return {
-                "insufficient_data": True,
-                "message": "No data available for routine insights"
-            }
-        
-        # Get trend analysis
-        trend_analysis = await trend_analysis_service.analyze_routine_effectiveness(user_id, historical_data)
-        
+    logger.debug("💡 [API] Getting routine insights for user: %s, days: %s", user_id, days)
+    
+    # Get historical data
+    historical_data = await historical_data_service.get_user_history(user_id, days)
+    
+    if not historical_data:
         return {
-            "routine_insights": trend_analysis.get('routine_insights', []),
-            "recommendations": trend_analysis.get('recommendations', []),
-            "overall_trends": trend_analysis.get('overall_trends', {}),
-            "analysis_period": trend_analysis.get('analysis_period', {})
+            "insufficient_data": True,
+            "message": "No data available for routine insights"
         }
-        
-    except Exception as e:
-        print(f"❌ [API] Routine insights failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate routine insights: {str(e)}")
+    
+    # Get trend analysis
+    trend_analysis = await trend_analysis_service.analyze_routine_effectiveness(user_id, historical_data)
+    
+    return {
+        "routine_insights": trend_analysis.get('routine_insights', []),
+        "recommendations": trend_analysis.get('recommendations', []),
+        "overall_trends": trend_analysis.get('overall_trends', {}),
+        "analysis_period": trend_analysis.get('analysis_period', {})
+    }
+    
 
 @app.get("/user/{user_id}/statistics")
 async def get_user_statistics(
     user_id: str,
-    days: int = 30
+    days: int = Query(30, ge=1, le=365)
 ):
     """
     Get user's overall statistics and trends
     """
-    try:
-        print(f"📈 [API] Getting statistics for user: {user_id}, days: {days}")
-        
-        # Get statistics from historical data service
-        statistics = historical_data_service.get_user_statistics(user_id, days)
-        
-        return statistics
-        
-    except Exception as e:
-        print(f"❌ [API] Statistics retrieval failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to get user statistics: {str(e)}")
+    logger.debug("📈 [API] Getting statistics for user: %s, days: %s", user_id, days)
+    
+    # Get statistics from historical data service
+    statistics = historical_data_service.get_user_statistics(user_id, days)
+    
+    return statistics
+    
+
+@app.get("/user/{user_id}/analysis")
+async def get_batched_analysis(
+    request: Request,
+    user_id: str,
+    days: int = Query(30, ge=1, le=365),
+    include: str = "smart,features,products",
+    feature: str = None,
+    product_id: str = None
+):
+    """
+    Batched analysis endpoint: one smart-analysis computation serves the
+    whole dashboard in a single round trip. `include` selects sections
+    (smart, features, products, weekly); `feature`/`product_id` filter to
+    one row.
+
+    The smart-analysis, feature-improvements and
+    product-effectiveness-detailed endpoints remain as per-section views
+    over the same cached computation for older clients.
+    """
+    logger.debug("🧠 [API] Getting batched analysis for user: %s, days: %s, include: %s", user_id, days, include)
+
+    wanted = {section.strip() for section in include.split(",") if section.strip()}
+
+    # The weekly section is independent of the correlation analysis -
+    # run the two concurrently so the slower one bounds the latency
+    if "weekly" in wanted:
+        smart_analysis, weekly_analysis = await asyncio.gather(
+            _cached_smart_analysis(user_id, days),
+            weekly_analysis_service.get_weekly_analysis(user_id, 7)
+        )
+    else:
+        smart_analysis = await _cached_smart_analysis(user_id, days)
+        weekly_analysis = None
+
+    if smart_analysis is None:
+        return {
+            "insufficient_data": True,
+            "message": "No data available for analysis. Need at least 3 data points.",
+            "current_data_points": 0
+        }
+
+    response: Dict[str, Any] = {
+        "insufficient_data": smart_analysis.get("insufficient_data", False),
+        "analysis_period": smart_analysis.get("analysis_period", {})
+    }
+
+    if "smart" in wanted:
+        response["smart_insights"] = smart_analysis.get("smart_insights", [])
+        response["trust_metrics"] = smart_analysis.get("trust_metrics", {})
+
+    if "features" in wanted:
+        if feature:
+            improvement = _improvement_by_name(smart_analysis, feature)
+            response["feature_improvements"] = [improvement] if improvement else []
+        else:
+            response["feature_improvements"] = smart_analysis.get("feature_improvements", [])
+
+    if "products" in wanted:
+        if product_id:
+            impact = _impact_by_id(smart_analysis, product_id)
+            response["product_impacts"] = [impact] if impact else []
+        else:
+            response["product_impacts"] = smart_analysis.get("product_impacts", [])
+
+    if "weekly" in wanted:
+        response["weekly_analysis"] = weekly_analysis
+
+    # The payload is plain dicts/lists already - return it directly so
+    # FastAPI skips the jsonable_encoder pass and orjson does the rest
+    etag = _analysis_etag(smart_analysis, user_id, days, include, feature, product_id)
+    return _conditional_analysis_response(request, etag, response)
+
 
 @app.get("/user/{user_id}/smart-analysis")
 async def get_smart_analysis(
+    request: Request,
     user_id: str,
-    days: int = 30
+    days: int = Query(30, ge=1, le=365)
 ):
     """
     Get ultra-smart analysis correlating specific products with facial feature improvements
     """
-    try:
-        print(f"🧠 [API] Getting smart analysis for user: {user_id}, days: {days}")
-        
-        # Get historical data
-        historical_data = await historical_data_service.get_user_history(user_id, days)
-        
-        if not historical_data:
-            return {
-                "insufficient_data": True,
-                "message": "No data available for smart analysis. Need at least 3 data points.",
-                "current_data_points": 0
-            }
-        
-        # Perform advanced feature correlation analysis
-        smart_analysis = feature_correlation_analyzer.analyze_feature_product_correlations(historical_data)
-        
-        print(f"✅ [API] Smart analysis completed for user: {user_id}")
-        return smart_analysis
-        
-    except Exception as e:
-        print(f"❌ [API] Smart analysis failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate smart analysis: {str(e)}")
+    logger.debug("🧠 [API] Getting smart analysis for user: %s, days: %s", user_id, days)
+    
+    # Perform advanced feature correlation analysis (cached per user/days)
+    smart_analysis = await _cached_smart_analysis(user_id, days)
+
+    if smart_analysis is None:
+        return {
+            "insufficient_data": True,
+            "message": "No data available for smart analysis. Need at least 3 data points.",
+            "current_data_points": 0
+        }
+
+    logger.debug("✅ [API] Smart analysis completed for user: %s", user_id)
+    etag = _analysis_etag(smart_analysis, user_id, days)
+    return _conditional_analysis_response(request, etag, smart_analysis)
+    
 
 @app.get("/user/{user_id}/feature-improvements")
 async def get_feature_improvements(
+    request: Request,
     user_id: str,
     feature: str = None,
-    days: int = 30
+    days: int = Query(30, ge=1, le=365)
 ):
     """
     Get detailed analysis of specific facial feature improvements
     """
-    try:
-        print(f"📊 [API] Getting feature improvements for user: {user_id}, feature: {feature}")
-        
-        # Get historical data
-        historical_data = await historical_data_service.get_user_history(user_id, days)
-        
-        if not historical_data:
-            return {
-                "insufficient_data": True,
-                "message": "No data available for feature analysis"
-            }
-        
-        # Get smart analysis
-        smart_analysis = feature_correlation_analyzer.analyze_feature_product_correlations(historical_data)
-        
-        if feature:
-            # Filter for specific feature
-            feature_improvements = [
-                imp for imp in smart_analysis.get('feature_improvements', [])
-                if imp.get('feature') == feature
-            ]
-            return {
-                "feature": feature,
-                "improvement": feature_improvements[0] if feature_improvements else None
-            }
-        else:
-            # Return all features
-            return {
-                "feature_improvements": smart_analysis.get('feature_improvements', []),
-                "analysis_period": smart_analysis.get('analysis_period', {})
-            }
-        
-    except Exception as e:
-        print(f"❌ [API] Feature improvements analysis failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to analyze feature improvements: {str(e)}")
+    logger.debug("📊 [API] Getting feature improvements for user: %s, feature: %s", user_id, feature)
+    
+    # Get smart analysis (cached per user/days); a feature filter lets
+    # the analyzer skip every other feature on a cache miss
+    smart_analysis = await _cached_smart_analysis(
+        user_id, days, only_features={feature} if feature else None
+    )
+
+    if smart_analysis is None:
+        return {
+            "insufficient_data": True,
+            "message": "No data available for feature analysis"
+        }
+
+    if feature:
+        # Look up the specific feature via the side index
+        payload = {
+            "feature": feature,
+            "improvement": _improvement_by_name(smart_analysis, feature)
+        }
+    else:
+        # Return all features
+        payload = {
+            "feature_improvements": smart_analysis.get('feature_improvements', []),
+            "analysis_period": smart_analysis.get('analysis_period', {})
+        }
+
+    etag = _analysis_etag(smart_analysis, user_id, days, feature)
+    return _conditional_analysis_response(request, etag, payload)
+    
 
 @app.get("/user/{user_id}/product-effectiveness-detailed")
 async def get_detailed_product_effectiveness(
+    request: Request,
     user_id: str,
     product_id: str = None,
-    days: int = 30
+    days: int = Query(30, ge=1, le=365)
 ):
     """
     Get detailed product effectiveness analysis with feature-specific impacts
     """
-    try:
-        print(f"🔍 [API] Getting detailed product effectiveness for user: {user_id}, product: {product_id}")
-        
-        # Get historical data
-        historical_data = await historical_data_service.get_user_history(user_id, days)
-        
-        if not historical_data:
-            return {
-                "insufficient_data": True,
-                "message": "No data available for detailed product analysis"
-            }
-        
-        # Get smart analysis
-        smart_analysis = feature_correlation_analyzer.analyze_feature_product_correlations(historical_data)
-        
-        if product_id:
-            # Filter for specific product
-            product_impacts = [
-                impact for impact in smart_analysis.get('product_impacts', [])
-                if impact.get('product_id') == product_id
-            ]
-            return {
-                "product_id": product_id,
-                "detailed_impact": product_impacts[0] if product_impacts else None
-            }
-        else:
-            # Return all products
-            return {
-                "product_impacts": smart_analysis.get('product_impacts', []),
-                "trust_metrics": smart_analysis.get('trust_metrics', {}),
-                "analysis_period": smart_analysis.get('analysis_period', {})
-            }
-        
-    except Exception as e:
-        print(f"❌ [API] Detailed product effectiveness analysis failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to analyze detailed product effectiveness: {str(e)}")
+    logger.debug("🔍 [API] Getting detailed product effectiveness for user: %s, product: %s", user_id, product_id)
+    
+    # Get smart analysis (cached per user/days); a product filter lets
+    # the analyzer skip every other product on a cache miss
+    smart_analysis = await _cached_smart_analysis(
+        user_id, days, only_products={product_id} if product_id else None
+    )
+
+    if smart_analysis is None:
+        return {
+            "insufficient_data": True,
+            "message": "No data available for detailed product analysis"
+        }
+
+    if product_id:
+        # Look up the specific product via the side index
+        payload = {
+            "product_id": product_id,
+            "detailed_impact": _impact_by_id(smart_analysis, product_id)
+        }
+    else:
+        # Return all products
+        payload = {
+            "product_impacts": smart_analysis.get('product_impacts', []),
+            "trust_metrics": smart_analysis.get('trust_metrics', {}),
+            "analysis_period": smart_analysis.get('analysis_period', {})
+        }
+
+    etag = _analysis_etag(smart_analysis, user_id, days, product_id)
+    return _conditional_analysis_response(request, etag, payload)
+    
 
 @app.get("/user/{user_id}/weekly-analysis")
 async def get_weekly_analysis(
     user_id: str,
-    days: int = 7
+    days: int = Query(7, ge=1, le=365)
 ):
     """
     Get comprehensive weekly analysis with trends and insights
     """
-    try:
-        print(f"📊 [API] Getting weekly analysis for {user_id}")
-        
-        # Get weekly analysis
-        weekly_analysis = await weekly_analysis_service.get_weekly_analysis(user_id, days)
-        
-        print(f"✅ [API] Weekly analysis complete")
-        return weekly_analysis
-        
-    except Exception as e:
-        print(f"❌ [API] Weekly analysis failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to get weekly analysis: {str(e)}")
+    logger.debug("📊 [API] Getting weekly analysis for %s", user_id)
+    
+    # Get weekly analysis
+    weekly_analysis = await weekly_analysis_service.get_weekly_analysis(user_id, days)
+    
+    logger.debug("✅ [API] Weekly analysis complete")
+    return weekly_analysis
+    
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # String form is required once workers > 1; uvloop and httptools ship
+    # with uvicorn[standard]. Production still launches through start.py.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count() or 1,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
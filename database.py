@@ -1,5 +1,6 @@
 import motor.motor_asyncio
 import os
+from datetime import datetime
 from typing import Optional
 from pymongo import MongoClient
 import asyncio
@@ -38,11 +39,19 @@ async def create_indexes(db: motor.motor_asyncio.AsyncIOMotorDatabase):
         # Analyses collection indexes
         await db.analyses.create_index([("user_id", 1), ("date", -1)])
         await db.analyses.create_index([("user_id", 1), ("created_at", -1)])
+        await db.analyses.create_index([("user_id", 1), ("date", 1), ("created_at", -1)])
         
         # Users collection indexes
         await db.users.create_index([("user_id", 1)], unique=True)
         await db.users.create_index([("email", 1)], unique=True, sparse=True)
         
+        # Session TTL index - MongoDB's background expiry thread vacuums
+        # expired refresh sessions for free, so no delete_many sweeps
+        await db.user_sessions.create_index("expires_at", expireAfterSeconds=0)
+
+        # Precomputed smart-analysis documents, one per (user, window)
+        await db.user_analysis.create_index([("user_id", 1), ("days", 1)], unique=True)
+
         # Summaries collection indexes
         await db.summaries.create_index([("user_id", 1), ("date", -1)])
         await db.summaries.create_index([("user_id", 1), ("type", 1)])
@@ -82,6 +91,36 @@ async def get_user_analyses(db: motor.motor_asyncio.AsyncIOMotorDatabase, user_i
         print(f"Error fetching analyses: {e}")
         raise e
 
+async def save_user_analysis(db: motor.motor_asyncio.AsyncIOMotorDatabase, user_id: str, days: int,
+                             payload: dict, last_scan_ts: Optional[datetime] = None):
+    """
+    Save or update a precomputed smart-analysis document for a (user, window)
+    """
+    try:
+        result = await db.user_analysis.update_one(
+            {"user_id": user_id, "days": days},
+            {"$set": {
+                "payload": payload,
+                "last_scan_ts": last_scan_ts,
+                "computed_at": datetime.now()
+            }},
+            upsert=True
+        )
+        return result
+    except Exception as e:
+        print(f"Error saving user analysis: {e}")
+        raise e
+
+async def get_user_analysis(db: motor.motor_asyncio.AsyncIOMotorDatabase, user_id: str, days: int):
+    """
+    Get the precomputed smart-analysis document for a (user, window)
+    """
+    try:
+        return await db.user_analysis.find_one({"user_id": user_id, "days": days})
+    except Exception as e:
+        print(f"Error fetching user analysis: {e}")
+        raise e
+
 async def save_user_data(db: motor.motor_asyncio.AsyncIOMotorDatabase, user_data: dict):
     """
     Save or update user data
@@ -1,14 +1,34 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-import json
+import asyncio
+import logging
+import orjson
 import os
 from pathlib import Path
 
+from cachetools import TTLCache
+
+logger = logging.getLogger("sleepface.history")
+
 class HistoricalDataService:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.db = None  # Will be set by main.py
+        # Short-lived per-(user, days) history cache: several endpoints
+        # fetch the same history within seconds of each other. History is
+        # append-only per day, so a 60s TTL is safe, and saves invalidate.
+        self._history_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+        # Per-(user, days) locks so concurrent cache misses (several
+        # dashboard endpoints firing at once) share one fetch instead of
+        # each hitting the database
+        self._history_locks: Dict[tuple, asyncio.Lock] = {}
+
+    def _invalidate_history_cache(self, user_id: str):
+        """Drop cached history for a user after a new entry is saved"""
+        stale_keys = [key for key in self._history_cache.keys() if key[0] == user_id]
+        for key in stale_keys:
+            self._history_cache.pop(key, None)
     
     def set_database(self, db):
         """Set MongoDB database instance for registered user data retrieval"""
@@ -21,25 +41,27 @@ class HistoricalDataService:
             
             # Load existing data
             if user_file.exists():
-                with open(user_file, 'r') as f:
-                    historical_data = json.load(f)
+                with open(user_file, 'rb') as f:
+                    historical_data = orjson.loads(f.read())
             else:
                 historical_data = []
             
-            # Add new analysis data
+            # Add new analysis data. The timestamp is epoch seconds so reads
+            # never parse or format datetime strings per entry.
             historical_data.append({
                 'date': analysis_data.get('date'),
                 'sleep_score': analysis_data.get('sleep_score'),
                 'skin_health_score': analysis_data.get('skin_health_score'),
                 'features': analysis_data.get('features', {}),
                 'routine': analysis_data.get('routine', {}),
-                'timestamp': datetime.now().isoformat()
+                'ts': int(datetime.now().timestamp())
             })
             
             # Save updated data
-            with open(user_file, 'w') as f:
-                json.dump(historical_data, f, indent=2)
+            with open(user_file, 'wb') as f:
+                f.write(orjson.dumps(historical_data))
             
+            self._invalidate_history_cache(user_id)
             print(f"💾 [HISTORICAL DATA] Saved analysis data for user {user_id}")
             return True
             
@@ -52,7 +74,32 @@ class HistoricalDataService:
         
         For registered users: Retrieves from MongoDB (persistent storage)
         For guest users: Retrieves from local JSON (temporary cache)
+        Results are cached for 60s per (user_id, days), and concurrent
+        cache misses for the same key coalesce onto one fetch.
+
+        Entries carry `ts` as epoch seconds (int); consumers should not
+        expect an ISO `timestamp` string.
         """
+        cache_key = (user_id, days)
+        cached = self._history_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("📊 [CACHE] Returning cached history for user %s", user_id)
+            return cached
+
+        lock = self._history_locks.setdefault(cache_key, asyncio.Lock())
+        try:
+            async with lock:
+                cached = self._history_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug("📊 [CACHE] Returning cached history for user %s", user_id)
+                    return cached
+                return await self._fetch_user_history(user_id, days)
+        finally:
+            self._history_locks.pop(cache_key, None)
+
+    async def _fetch_user_history(self, user_id: str, days: int) -> List[Dict[str, Any]]:
+        """Fetch a user's history from MongoDB or local JSON and cache it"""
+        cache_key = (user_id, days)
         try:
             # For registered users, retrieve from MongoDB
             if user_id != "guest" and not user_id.startswith("guest_") and self.db is not None:
@@ -65,13 +112,14 @@ class HistoricalDataService:
                     # Convert MongoDB documents to the format expected by analysis
                     historical_data = []
                     for analysis in analyses:
+                        created_at = analysis.get('created_at')
                         historical_data.append({
                             'date': analysis.get('date'),
                             'sleep_score': analysis.get('sleep_score'),
                             'skin_health_score': analysis.get('skin_health_score'),
                             'features': analysis.get('features', {}),
                             'routine': analysis.get('routine', {}),
-                            'timestamp': analysis.get('created_at', datetime.now()).isoformat() if isinstance(analysis.get('created_at'), datetime) else str(analysis.get('created_at', datetime.now().isoformat()))
+                            'ts': int(created_at.timestamp()) if isinstance(created_at, datetime) else int(datetime.now().timestamp())
                         })
                     
                     # Filter by date range
@@ -82,6 +130,7 @@ class HistoricalDataService:
                     ]
                     
                     print(f"📊 [MONGODB] Retrieved {len(filtered_data)} entries for registered user {user_id}")
+                    self._history_cache[cache_key] = filtered_data
                     return filtered_data
                     
                 except Exception as mongo_error:
@@ -95,8 +144,8 @@ class HistoricalDataService:
                 print(f"📊 [LOCAL JSON] No historical data file found for user {user_id}")
                 return []
             
-            with open(user_file, 'r') as f:
-                historical_data = json.load(f)
+            with open(user_file, 'rb') as f:
+                historical_data = orjson.loads(f.read())
             
             # Filter by date range
             cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()[:10]
@@ -106,12 +155,64 @@ class HistoricalDataService:
             ]
             
             print(f"📊 [LOCAL JSON] Retrieved {len(filtered_data)} entries for user {user_id}")
+            self._history_cache[cache_key] = filtered_data
             return filtered_data
             
         except Exception as e:
             print(f"❌ [HISTORICAL DATA] Error retrieving data: {e}")
             return []
     
+    async def get_user_entry_for_date(self, user_id: str, date: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent analysis entry for a specific date
+
+        For registered users this is a single indexed find_one in MongoDB
+        instead of fetching the whole history and filtering in Python.
+        Guest users fall back to the local JSON cache.
+        """
+        try:
+            # For registered users, query MongoDB directly
+            if user_id != "guest" and not user_id.startswith("guest_") and self.db is not None:
+                try:
+                    doc = await self.db.analyses.find_one(
+                        {"user_id": user_id, "date": date},
+                        sort=[("created_at", -1)]
+                    )
+                    if doc:
+                        print(f"📊 [MONGODB] Found entry for user {user_id} on {date}")
+                        created_at = doc.get('created_at')
+                        return {
+                            'date': doc.get('date'),
+                            'sleep_score': doc.get('sleep_score'),
+                            'skin_health_score': doc.get('skin_health_score'),
+                            'features': doc.get('features', {}),
+                            'routine': doc.get('routine', {}),
+                            'ts': int(created_at.timestamp()) if isinstance(created_at, datetime) else int(datetime.now().timestamp())
+                        }
+                    return None
+
+                except Exception as mongo_error:
+                    print(f"⚠️ [MONGODB] Error retrieving entry: {mongo_error}, falling back to local JSON")
+                    # Fall through to local JSON as backup
+
+            # For guest users or fallback, scan the local JSON file
+            user_file = self.data_dir / f"{user_id}_history.json"
+
+            if not user_file.exists():
+                return None
+
+            with open(user_file, 'rb') as f:
+                historical_data = orjson.loads(f.read())
+
+            matching_entries = [
+                entry for entry in historical_data
+                if entry.get('date') == date
+            ]
+            return matching_entries[-1] if matching_entries else None
+
+        except Exception as e:
+            print(f"❌ [HISTORICAL DATA] Error retrieving entry for date: {e}")
+            return None
+
     def get_user_history_by_date_range(self, user_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """Get user's historical data for a specific date range"""
         try:
@@ -120,8 +221,8 @@ class HistoricalDataService:
             if not user_file.exists():
                 return []
             
-            with open(user_file, 'r') as f:
-                historical_data = json.load(f)
+            with open(user_file, 'rb') as f:
+                historical_data = orjson.loads(f.read())
             
             # Filter by date range
             filtered_data = [
@@ -190,8 +291,8 @@ class HistoricalDataService:
             if not user_file.exists():
                 return True
             
-            with open(user_file, 'r') as f:
-                historical_data = json.load(f)
+            with open(user_file, 'rb') as f:
+                historical_data = orjson.loads(f.read())
             
             # Filter to keep only recent data
             cutoff_date = (datetime.now() - timedelta(days=days_to_keep)).isoformat()[:10]
@@ -201,8 +302,8 @@ class HistoricalDataService:
             ]
             
             # Save filtered data
-            with open(user_file, 'w') as f:
-                json.dump(filtered_data, f, indent=2)
+            with open(user_file, 'wb') as f:
+                f.write(orjson.dumps(filtered_data))
             
             print(f"🧹 [HISTORICAL DATA] Cleaned up old data for user {user_id}, kept {len(filtered_data)} entries")
             return True
@@ -15,6 +15,29 @@ try:
 except ImportError:
     feature_correlation_analyzer = None
 
+# Shared pooled HTTP client for all providers. Per-call AsyncClient
+# instances paid a fresh TCP+TLS handshake on every LLM request; one
+# keep-alive pool per worker process amortizes that across calls.
+_http_client = None
+
+def get_http_client():
+    """Return the process-wide pooled httpx.AsyncClient, creating it lazily"""
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+            timeout=30.0
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the pooled client (called from app shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 class ModelType(Enum):
     RULE_BASED = "rule_based"
     HUGGINGFACE_FREE = "huggingface_free"
@@ -694,25 +717,24 @@ class HuggingFaceFreeProvider(BaseLLMProvider):
     async def generate_summary(self, context: str, analysis_data: Dict) -> Dict[str, Any]:
         """Generate summary using Hugging Face free API with world-class prompt"""
         try:
-            import httpx
             
             # Use the world-class prompt
             prompt = self._create_world_class_prompt(context, analysis_data)
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"inputs": prompt},
-                    timeout=30.0
-                )
+            client = get_http_client()
+            response = await client.post(
+                self.api_url,
+                headers=self.headers,
+                json={"inputs": prompt},
+                timeout=30.0
+            )
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    # Parse the response and return structured data
-                    return self._parse_huggingface_response(result)
-                else:
-                    raise Exception(f"API error: {response.status_code}")
+            if response.status_code == 200:
+                result = response.json()
+                # Parse the response and return structured data
+                return self._parse_huggingface_response(result)
+            else:
+                raise Exception(f"API error: {response.status_code}")
                     
         except Exception as e:
             print(f"HuggingFace API error: {e}")
@@ -766,37 +788,35 @@ class OllamaLocalProvider(BaseLLMProvider):
     
     async def _check_ollama(self) -> bool:
         try:
-            import httpx
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.base_url}/api/tags", timeout=5.0)
-                return response.status_code == 200
+            client = get_http_client()
+            response = await client.get(f"{self.base_url}/api/tags", timeout=5.0)
+            return response.status_code == 200
         except:
             return False
     
     async def generate_summary(self, context: str, analysis_data: Dict) -> Dict[str, Any]:
         """Generate summary using local Ollama with world-class prompt"""
         try:
-            import httpx
             
             # Use the world-class prompt
             prompt = self._create_world_class_prompt(context, analysis_data)
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False
-                    },
-                    timeout=60.0
-                )
+            client = get_http_client()
+            response = await client.post(
+                f"{self.base_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False
+                },
+                timeout=60.0
+            )
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    return self._parse_ollama_response(result.get('response', ''))
-                else:
-                    raise Exception(f"Ollama error: {response.status_code}")
+            if response.status_code == 200:
+                result = response.json()
+                return self._parse_ollama_response(result.get('response', ''))
+            else:
+                raise Exception(f"Ollama error: {response.status_code}")
                     
         except Exception as e:
             print(f"Ollama error: {e}")
@@ -914,49 +934,49 @@ class GrokProvider(BaseLLMProvider):
     async def generate_summary(self, context: str, analysis_data: Dict) -> Dict[str, Any]:
         """Generate summary using Grok API - xAI's model - TOKEN OPTIMIZED"""
         try:
-            import httpx
             
             # Use the ultra-concise prompt to minimize tokens (2-liner format)
             prompt = self._create_concise_prompt(context, analysis_data)
             
-            async with httpx.AsyncClient(timeout=2.0) as client:  # 2 second timeout for speed
-                response = await client.post(
-                    "https://api.x.ai/v1/chat/completions",  # xAI API endpoint
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": "Concise skincare advisor. 2 lines max."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "max_tokens": 80,  # Reduced to 80 for SPEED (2 short lines only)
-                        "temperature": 0.2  # Lower for faster, focused responses
-                    }
-                )
+            client = get_http_client()
+            response = await client.post(
+                "https://api.x.ai/v1/chat/completions",  # xAI API endpoint
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": "Concise skincare advisor. 2 lines max."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "max_tokens": 80,  # Reduced to 80 for SPEED (2 short lines only)
+                    "temperature": 0.2  # Lower for faster, focused responses
+                },
+                timeout=2.0  # 2 second timeout for speed
+            )
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result['choices'][0]['message']['content'].strip()
+            if response.status_code == 200:
+                result = response.json()
+                content = result['choices'][0]['message']['content'].strip()
                     
-                    # Parse 2-liner response (same format as OpenAI)
-                    lines = [line.strip() for line in content.split('\n') if line.strip()]
-                    daily_summary = lines[0] if len(lines) > 0 else "Analysis complete."
-                    recommendation = lines[1] if len(lines) > 1 else "Continue your routine."
+                # Parse 2-liner response (same format as OpenAI)
+                lines = [line.strip() for line in content.split('\n') if line.strip()]
+                daily_summary = lines[0] if len(lines) > 0 else "Analysis complete."
+                recommendation = lines[1] if len(lines) > 1 else "Continue your routine."
                     
-                    return {
-                        "daily_summary": daily_summary,
-                        "key_insights": [daily_summary],
-                        "recommendations": [recommendation],
-                        "model": "Grok (xAI)",
-                        "provider": "xai",
-                        "tokens_used": result.get('usage', {}).get('total_tokens', 0)
-                    }
-                else:
-                    print(f"Grok API error: {response.status_code} - {response.text}")
-                    return None
+                return {
+                    "daily_summary": daily_summary,
+                    "key_insights": [daily_summary],
+                    "recommendations": [recommendation],
+                    "model": "Grok (xAI)",
+                    "provider": "xai",
+                    "tokens_used": result.get('usage', {}).get('total_tokens', 0)
+                }
+            else:
+                print(f"Grok API error: {response.status_code} - {response.text}")
+                return None
                     
         except Exception as e:
             print(f"Grok error: {e}")
@@ -1056,7 +1076,6 @@ class OpenAIFreeProvider(BaseLLMProvider):
     async def generate_summary(self, context: str, analysis_data: Dict) -> Dict[str, Any]:
         """Generate summary using OpenAI API - Dermatologist-grade recommendations"""
         try:
-            import httpx
             
             # Create engaging prompt for quality recommendations
             features = analysis_data.get('features', {})
@@ -1096,90 +1115,112 @@ PRODUCTS:
 
 Be CREATIVE and SPECIFIC. No generic advice. Include exact ingredients, percentages, application times, and techniques. Write each as one sentence on a NEW LINE. Keep section headers."""
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "max_completion_tokens": 400  # 4 specific recommendations with details
-                    }
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    content = result['choices'][0]['message']['content']
-                    if content is None:
-                        content = ""
-                    content = content.strip()
-                    
-                    tokens_used = result.get('usage', {}).get('total_tokens', 0)
-                    print(f"✅ OpenAI: {tokens_used} tokens, {len(content)} chars")
+            # Stream the completion so token chunks are consumed as they
+            # arrive instead of buffering the whole body and JSON-decoding
+            # it at the end; the last token marks the response as complete
+            client = get_http_client()
+            content_parts = []
+            tokens_used = 0
+            status_code = None
+            error_detail = None
+            async with client.stream(
+                "POST",
+                "https://api.openai.com/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {"role": "user", "content": prompt}
+                    ],
+                    "max_completion_tokens": 400,  # 4 specific recommendations with details
+                    "stream": True,
+                    "stream_options": {"include_usage": True}
+                },
+                timeout=10.0
+            ) as response:
+                status_code = response.status_code
+                if status_code != 200:
+                    error_detail = (await response.aread()).decode(errors='replace')
+                else:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data: "):
+                            continue
+                        data = line[6:]
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        choices = chunk.get('choices')
+                        if choices:
+                            delta = choices[0].get('delta', {}).get('content')
+                            if delta:
+                                content_parts.append(delta)
+                        usage = chunk.get('usage')
+                        if usage:
+                            tokens_used = usage.get('total_tokens', 0)
+
+            if status_code == 200:
+                content = ''.join(content_parts).strip()
+                print(f"✅ OpenAI: {tokens_used} tokens, {len(content)} chars")
                     
-                    # Parse recommendations - split into natural remedies and products
-                    lines = [line.strip() for line in content.split('\n') if line.strip()]
+                # Parse recommendations - split into natural remedies and products
+                lines = [line.strip() for line in content.split('\n') if line.strip()]
                     
-                    natural_remedies = []
-                    product_recommendations = []
-                    current_section = None
+                natural_remedies = []
+                product_recommendations = []
+                current_section = None
                     
-                    for line in lines:
-                        # Detect section headers
-                        line_upper = line.upper()
-                        if 'NATURAL' in line_upper and 'REMED' in line_upper:
-                            current_section = 'natural'
-                            continue
-                        elif 'PRODUCT' in line_upper:
-                            current_section = 'products'
-                            continue
+                for line in lines:
+                    # Detect section headers
+                    line_upper = line.upper()
+                    if 'NATURAL' in line_upper and 'REMED' in line_upper:
+                        current_section = 'natural'
+                        continue
+                    elif 'PRODUCT' in line_upper:
+                        current_section = 'products'
+                        continue
                         
-                        # Skip empty lines
-                        if not line:
-                            continue
+                    # Skip empty lines
+                    if not line:
+                        continue
                             
-                        # Remove numbering/bullets if present
-                        clean_line = line.lstrip('0123456789.-•) ').strip()
-                        # Remove markdown formatting
-                        clean_line = clean_line.replace('**', '').replace('*', '').replace('__', '').replace('_', '')
-                        # Remove colon-based headers
-                        if ':' in clean_line:
-                            parts = clean_line.split(':', 1)
-                            if len(parts) == 2 and len(parts[0].split()) <= 4:
-                                clean_line = parts[1].strip()
+                    # Remove numbering/bullets if present
+                    clean_line = line.lstrip('0123456789.-•) ').strip()
+                    # Remove markdown formatting
+                    clean_line = clean_line.replace('**', '').replace('*', '').replace('__', '').replace('_', '')
+                    # Remove colon-based headers
+                    if ':' in clean_line:
+                        parts = clean_line.split(':', 1)
+                        if len(parts) == 2 and len(parts[0].split()) <= 4:
+                            clean_line = parts[1].strip()
                         
-                        # Add to appropriate section
-                        if clean_line and len(clean_line) > 15:  # Must be substantial
-                            if current_section == 'natural':
-                                natural_remedies.append(clean_line)
-                            elif current_section == 'products':
-                                product_recommendations.append(clean_line)
+                    # Add to appropriate section
+                    if clean_line and len(clean_line) > 15:  # Must be substantial
+                        if current_section == 'natural':
+                            natural_remedies.append(clean_line)
+                        elif current_section == 'products':
+                            product_recommendations.append(clean_line)
                     
-                    # Combine for backwards compatibility (natural first, then products)
-                    recommendations = natural_remedies + product_recommendations
-                    
-                    return {
-                        "daily_summary": f"Sleep: {sleep_score}/100, Skin: {skin_score}/100. Focus: {area1}, {area2}.",
-                        "key_insights": recommendations[:3],
-                        "recommendations": recommendations[:4],  # Max 4 recommendations (for backwards compatibility)
-                        "natural_remedies": natural_remedies[:2],  # Separate natural remedies
-                        "product_recommendations": product_recommendations[:2],  # Separate product recommendations
-                        "model": f"OpenAI {self.model}",
-                        "provider": "openai",
-                        "tokens_used": tokens_used
-                    }
-                else:
-                    error_detail = response.text
-                    print(f"OpenAI API error: {response.status_code}")
-                    print(f"OpenAI error details: {error_detail}")
-                    return None
+                # Combine for backwards compatibility (natural first, then products)
+                recommendations = natural_remedies + product_recommendations
                     
+                return {
+                    "daily_summary": f"Sleep: {sleep_score}/100, Skin: {skin_score}/100. Focus: {area1}, {area2}.",
+                    "key_insights": recommendations[:3],
+                    "recommendations": recommendations[:4],  # Max 4 recommendations (for backwards compatibility)
+                    "natural_remedies": natural_remedies[:2],  # Separate natural remedies
+                    "product_recommendations": product_recommendations[:2],  # Separate product recommendations
+                    "model": f"OpenAI {self.model}",
+                    "provider": "openai",
+                    "tokens_used": tokens_used
+                }
+            else:
+                print(f"OpenAI API error: {status_code}")
+                print(f"OpenAI error details: {error_detail}")
+                return None
+
         except Exception as e:
             print(f"OpenAI error: {e}")
             return None